@@ -1,17 +1,12 @@
 import os
 import sys
+import collections
 import logging
-import traceback
+import logging.handlers
 import multiprocessing
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import time
 import psutil
-import GPUtil
-
-import cv2
-from fpdf import FPDF
-from pptx import Presentation
-from pptx.util import Inches, Pt
 
 from PyQt5.QtWidgets import (
     QApplication, QFileDialog, QVBoxLayout, QHBoxLayout, QComboBox,
@@ -22,7 +17,7 @@ from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QPropertyAnimation, QE
 from PyQt5.QtGui import QFont, QTextCursor, QColor, QIcon, QPalette
 
 # Import additional utility functions
-from videos_processor import extract_frames, create_pdf_from_frames, create_pptx_from_frames
+from videos_processor import init_worker, may_decode_on_gpu, process_video
 
 class AdvancedLoggingHandler(logging.Handler):
     """Enhanced logging handler with more detailed formatting and severity levels."""
@@ -34,53 +29,98 @@ class AdvancedLoggingHandler(logging.Handler):
             datefmt="%Y-%m-%d %H:%M:%S"
         )
 
+    # Differentiate log levels with color coding
+    LEVEL_PREFIXES = {
+        logging.ERROR: "🔴 ",
+        logging.WARNING: "🟠 ",
+        logging.INFO: "🟢 ",
+    }
+
     def emit(self, record):
         try:
-            msg = self.format(record)
-            # Differentiate log levels with color coding
-            if record.levelno == logging.ERROR:
-                msg = f"🔴 {msg}"
-            elif record.levelno == logging.WARNING:
-                msg = f"🟠 {msg}"
-            elif record.levelno == logging.INFO:
-                msg = f"🟢 {msg}"
+            msg = self.LEVEL_PREFIXES.get(record.levelno, "") + self.format(record)
             self.signal.emit(msg)
         except Exception:
             self.handleError(record)
 
+# One snapshot of pre-formatted resource readings, ready for display
+Stats = collections.namedtuple("Stats", "cpu_usage cores freq mem_used mem_avail gpu_lines")
+
+
 class ResourceMonitor:
     """Comprehensive system resource monitoring with GPU support."""
-    @staticmethod
-    def get_comprehensive_stats():
-        """Gather detailed system and GPU resources."""
-        stats = {
-            "CPU": {
-                "usage": f"{psutil.cpu_percent()}%",
-                "cores": multiprocessing.cpu_count(),
-                "frequency": f"{psutil.cpu_freq().current:.2f} MHz"
-            },
-            "Memory": {
-                "total": f"{psutil.virtual_memory().total / (1024**3):.2f} GB",
-                "used": f"{psutil.virtual_memory().percent}%",
-                "available": f"{psutil.virtual_memory().available / (1024**3):.2f} GB"
-            },
-            "GPU": []
-        }
+    GPU_POLL_INTERVAL = 10  # seconds between NVML queries
 
-        try:
-            gpus = GPUtil.getGPUs()
-            for gpu in gpus:
-                stats["GPU"].append({
-                    "name": gpu.name,
-                    "memory_total": f"{gpu.memoryTotal} MB",
-                    "memory_used": f"{gpu.memoryUsed} MB",
-                    "memory_free": f"{gpu.memoryFree} MB",
-                    "gpu_load": f"{gpu.load*100:.2f}%"
-                })
-        except Exception as e:
-            stats["GPU"] = [{"error": str(e)}]
+    _gpu_cache = "No GPU detected."
+    _gpu_ts = None
+    _nvml = None
 
-        return stats
+    @classmethod
+    def _load_nvml(cls):
+        """Return the initialised pynvml module, or False when NVML is unavailable."""
+        if cls._nvml is None:
+            # Imported on first use rather than at application start-up
+            try:
+                import pynvml
+                pynvml.nvmlInit()
+                cls._nvml = pynvml
+            except ImportError:
+                cls._nvml = False
+            except pynvml.NVMLError:
+                # No NVIDIA driver: report no GPU instead of retrying every poll
+                cls._nvml = False
+        return cls._nvml
+
+    @classmethod
+    def gpu_count(cls):
+        """Number of NVIDIA GPUs visible through NVML (0 without a driver)."""
+        pynvml = cls._load_nvml()
+        if not pynvml:
+            return 0
+        try:
+            return pynvml.nvmlDeviceGetCount()
+        except pynvml.NVMLError:
+            return 0
+
+    @classmethod
+    def get_gpu_stats(cls):
+        """Query NVIDIA GPUs in-process through NVML, reusing the last result for GPU_POLL_INTERVAL seconds."""
+        now = time.monotonic()
+        if cls._gpu_ts is not None and now - cls._gpu_ts < cls.GPU_POLL_INTERVAL:
+            return cls._gpu_cache
+        cls._gpu_ts = now
+
+        pynvml = cls._load_nvml()
+        gpu_lines = []
+        if pynvml:
+            try:
+                for index in range(pynvml.nvmlDeviceGetCount()):
+                    handle = pynvml.nvmlDeviceGetHandleByIndex(index)
+                    memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+                    utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
+                    gpu_lines.append(
+                        f"{pynvml.nvmlDeviceGetName(handle)}: "
+                        f"{memory.used / (1024**2):.0f}/{memory.total / (1024**2):.0f} MB, "
+                        f"Load: {utilization.gpu:.2f}%"
+                    )
+            except pynvml.NVMLError as e:
+                gpu_lines = [f"GPU error: {e}"]
+
+        cls._gpu_cache = "\n".join(gpu_lines) or "No GPU detected."
+        return cls._gpu_cache
+
+    @classmethod
+    def get_comprehensive_stats(cls):
+        """Gather detailed system and GPU resources."""
+        vm = psutil.virtual_memory()
+        return Stats(
+            cpu_usage=f"{psutil.cpu_percent(interval=None)}%",
+            cores=multiprocessing.cpu_count(),
+            freq=f"{psutil.cpu_freq().current:.2f} MHz",
+            mem_used=f"{vm.percent}%",
+            mem_avail=f"{vm.available / (1024**3):.2f} GB",
+            gpu_lines=cls.get_gpu_stats()
+        )
 
 
 class VideoConverterWorker(QThread):
@@ -89,113 +129,107 @@ class VideoConverterWorker(QThread):
     detailed_progress_signal = pyqtSignal(dict)
     completed_signal = pyqtSignal(str)
     log_signal = pyqtSignal(str)
-    resource_signal = pyqtSignal(dict)
 
-    def __init__(self, video_paths, output_folder, output_format, frame_interval, max_workers=None):
+    NVDEC_MAX_SESSIONS = 3  # NVIDIA GPUs have 1-3 NVDEC engines; more concurrent decodes only queue up
+
+    def __init__(self, video_paths, output_folder, output_format, frame_interval, max_width=1600, max_workers=None,
+                 backend=None):
         super().__init__()
         self.video_paths = video_paths
         self.output_folder = output_folder
         self.output_format = output_format
         self.frame_interval = frame_interval
+        self.max_width = max_width
+        self.backend = backend
         self.max_workers = max_workers or max(1, multiprocessing.cpu_count() - 1)
+        if may_decode_on_gpu(backend) and ResourceMonitor.gpu_count():
+            self.max_workers = min(self.max_workers, self.NVDEC_MAX_SESSIONS * ResourceMonitor.gpu_count())
+        # One process per video; share the cores between them to avoid oversubscription
+        self.concurrent_videos = max(1, min(self.max_workers, len(video_paths)))
+        self.decoder_threads = max(1, multiprocessing.cpu_count() // self.concurrent_videos)
 
         # Enhanced logging setup
         self.logger = logging.getLogger(f"Worker-{id(self)}")
         self.logger.setLevel(logging.INFO)
 
-        log_handler = AdvancedLoggingHandler(self.log_signal)
-        self.logger.addHandler(log_handler)
+        # Producers, including the worker processes, only enqueue records; a single listener
+        # thread formats and emits them. Spawned (not forked) workers are safe alongside Qt's threads;
+        # each child re-imports this module as __mp_main__ (loading PyQt5), which is why the
+        # window is only created under the __main__ guard.
+        self._mp_context = multiprocessing.get_context("spawn")
+        self._log_queue = self._mp_context.Queue()
+        self.logger.addHandler(logging.handlers.QueueHandler(self._log_queue))
         self.logger.propagate = False
-
-        # Resource monitoring timer
-        self.monitoring_timer = QTimer()
-        self.monitoring_timer.timeout.connect(self.emit_resource_stats)
-        self.monitoring_timer.start(2000)  # Every 2 seconds
-
-    def emit_resource_stats(self):
-        """Periodically emit system and GPU resource statistics."""
-        try:
-            stats = ResourceMonitor.get_comprehensive_stats()
-            self.resource_signal.emit(stats)
-        except Exception as e:
-            self.logger.error(f"Resource monitoring error: {e}")
+        self.log_listener = logging.handlers.QueueListener(self._log_queue, AdvancedLoggingHandler(self.log_signal))
+        self.log_listener.start()
 
     def run(self):
-        total_files = len(self.video_paths)
-        progress_step = 100 / total_files
-        start_time = time.time()
-
-        # Detailed progress tracking
-        progress_details = {
-            "total_files": total_files,
-            "processed_files": 0,
-            "successful_conversions": 0,
-            "failed_conversions": 0
-        }
-
-
-
-        for idx, video_path in enumerate(self.video_paths, 1):
-            try:
-                result = self.process_video(video_path)  # Call the processing function directly
-                if result:
-                    progress_details["successful_conversions"] += 1
-                    self.logger.info(f"✅ Processed: {video_path} \n ----------------------------------------")
-                else:
-                    progress_details["failed_conversions"] += 1
-                    self.completed_signal.emit(f"❌ Failed to process: {video_path} \n ---------------------------------------- ")
-            except Exception as e:
-                progress_details["failed_conversions"] += 1
-                self.completed_signal.emit(f"❌ Error processing {video_path}: {e} \n ----------------------------------------")
-
-            progress_details["processed_files"] = idx
-            current_progress = int(idx * progress_step)
-            
-            # Emit progress signals
-            self.progress_signal.emit(current_progress)
-            self.detailed_progress_signal.emit(progress_details)
-
-        # Stop resource monitoring
-        # self.monitoring_timer.stop()
-
-        total_time = time.time() - start_time
-        final_message = (
-            f"🏁 Conversion complete.\n"
-            f"Total time: {total_time:.2f} seconds\n"
-            f"Total files: {total_files}\n"
-            f"Successful: {progress_details['successful_conversions']}\n"
-            f"Failed: {progress_details['failed_conversions']}"
-        )
-        self.logger.info(final_message)
-        self.completed_signal.emit(final_message)
-
-
-    def process_video(self, video_path):
         try:
-            self.logger.info(f"Processing: {video_path}")
-            frames = extract_frames(video_path,interval=self.frame_interval, logger=self.logger)
-
-            if not frames:
-                self.logger.error(f"No frames extracted from {video_path}")
-                return False
-
-            base_name = os.path.splitext(os.path.basename(video_path))[0]  # Extract base name
-            self.logger.info(f"Base Name : {base_name} ---- {video_path}")
-            
-            # Fix: Make sure you pass the folder as the second argument.
-            if self.output_format == "pdf":
-                return create_pdf_from_frames(frames, base_name, self.output_folder, logger=self.logger)  # Pass both frames and output_folder
-            elif self.output_format == "pptx":
-                return create_pptx_from_frames(frames, base_name, self.output_folder, logger=self.logger)  # Same for pptx
-            else:
-                self.logger.error(f"Unsupported format: {self.output_format}")
-                return False
-        except Exception as e:
-            self.logger.error(f"Comprehensive error processing {video_path}: {traceback.format_exc()}")
-            return False
+            total_files = len(self.video_paths)
+            progress_step = 100 / total_files
+            start_time = time.time()
+
+            # Detailed progress tracking
+            progress_details = {
+                "total_files": total_files,
+                "processed_files": 0,
+                "successful_conversions": 0,
+                "failed_conversions": 0
+            }
 
 
 
+            # Keep the first CPU for the GUI thread and pin the video processes to the rest
+            worker_cores = None
+            if hasattr(os, "sched_getaffinity"):
+                available_cores = sorted(os.sched_getaffinity(0))
+                if len(available_cores) > 1:
+                    worker_cores = available_cores[1:]
+
+            with ProcessPoolExecutor(max_workers=self.concurrent_videos, mp_context=self._mp_context,
+                                     initializer=init_worker, initargs=(self._log_queue, worker_cores)) as executor:
+                futures = {
+                    executor.submit(process_video, video_path, self.output_folder, self.output_format,
+                                    self.frame_interval, max_width=self.max_width, threads=self.decoder_threads,
+                                    backend=self.backend): video_path
+                    for video_path in self.video_paths
+                }
+
+                # Results are consumed on this thread only, so progress_details needs no locking
+                for idx, future in enumerate(as_completed(futures), 1):
+                    video_path = futures[future]
+                    try:
+                        result = future.result()
+                        if result:
+                            progress_details["successful_conversions"] += 1
+                            self.logger.info(f"✅ Processed: {video_path} \n ----------------------------------------")
+                        else:
+                            progress_details["failed_conversions"] += 1
+                            self.completed_signal.emit(f"❌ Failed to process: {video_path} \n ---------------------------------------- ")
+                    except Exception as e:
+                        progress_details["failed_conversions"] += 1
+                        self.completed_signal.emit(f"❌ Error processing {video_path}: {e} \n ----------------------------------------")
+
+                    progress_details["processed_files"] = idx
+                    current_progress = int(idx * progress_step)
+
+                    # Emit progress signals; a snapshot, since the GUI thread reads it later
+                    self.progress_signal.emit(current_progress)
+                    self.detailed_progress_signal.emit(dict(progress_details))
+
+            total_time = time.time() - start_time
+            final_message = (
+                f"🏁 Conversion complete.\n"
+                f"Total time: {total_time:.2f} seconds\n"
+                f"Total files: {total_files}\n"
+                f"Successful: {progress_details['successful_conversions']}\n"
+                f"Failed: {progress_details['failed_conversions']}"
+            )
+            self.logger.info(final_message)
+            self.completed_signal.emit(final_message)
+        finally:
+            # Flush queued log records to the GUI before the thread finishes
+            self.log_listener.stop()
 
 
 class VideoConverterApp(QMainWindow):
@@ -208,6 +242,11 @@ class VideoConverterApp(QMainWindow):
 
         self.frame_interval = 30  # Initialize frame_interval with the default value
 
+        # Resource monitoring runs on the GUI thread, only while a conversion is active
+        self.resource_timer = QTimer(self)
+        self.resource_timer.timeout.connect(self.poll_resource_stats)
+        self.max_width = 1600  # Initialize max_width with the default value
+
     def setup_global_styles(self):
         """Set up global application styling."""
         # Define a consistent color palette
@@ -281,6 +320,10 @@ class VideoConverterApp(QMainWindow):
         self.frame_interval = self.frame_interval_spin_box.value() 
         print(f"frame_interval set to: {self.frame_interval} seconds")
 
+    def update_max_width(self):
+        """Update the max_width value (0 keeps the original resolution)."""
+        self.max_width = self.max_width_spin_box.value()
+
     def create_top_section(self):
         """Create the top section with file and folder selection."""
         top_widget = QWidget()
@@ -365,6 +408,26 @@ class VideoConverterApp(QMainWindow):
         top_layout.addLayout(frame_interval_section)
 
 
+        # Maximum frame width selection
+        max_width_section = QVBoxLayout()
+        max_width_label = self.create_section_label("📐 Max Frame Width (pixels)")
+        self.max_width_default_label = QLabel(f"Default: 1600 px")
+
+        self.max_width_spin_box = QSpinBox()
+        self.max_width_spin_box.setStyleSheet(self.frame_interval_spin_box.styleSheet())
+        self.max_width_spin_box.setMinimum(0)
+        self.max_width_spin_box.setMaximum(7680)
+        self.max_width_spin_box.setSingleStep(160)
+        self.max_width_spin_box.setSpecialValueText("Original")  # Shown for 0: no downscaling
+        self.max_width_spin_box.setValue(1600)  # Default value
+        self.max_width_spin_box.valueChanged.connect(self.update_max_width)
+
+        max_width_section.addWidget(max_width_label)
+        max_width_section.addWidget(self.max_width_default_label)  # Show default value
+        max_width_section.addWidget(self.max_width_spin_box)
+        top_layout.addLayout(max_width_section)
+
+
         # Conversion controls
         controls_section = QVBoxLayout()
         controls_label = self.create_section_label("⚙️ Conversion Settings")
@@ -583,7 +646,8 @@ class VideoConverterApp(QMainWindow):
             video_paths=self.video_paths,
             output_folder=self.output_folder,
             output_format=output_format,
-            frame_interval=self.frame_interval
+            frame_interval=self.frame_interval,
+            max_width=self.max_width
         )
 
         # Connect signals for progress, logging, and completion
@@ -591,10 +655,11 @@ class VideoConverterApp(QMainWindow):
         self.worker_thread.detailed_progress_signal.connect(self.update_detailed_progress)
         self.worker_thread.completed_signal.connect(self.show_completion_message)
         self.worker_thread.log_signal.connect(self.append_to_log)
-        self.worker_thread.resource_signal.connect(self.update_system_stats)
+        self.worker_thread.finished.connect(self.resource_timer.stop)
 
         # Start the worker thread
         self.worker_thread.start()
+        self.resource_timer.start(2000)  # Every 2 seconds
 
         # Disable the convert button while processing
         self.convert_button.setEnabled(False)
@@ -632,56 +697,24 @@ class VideoConverterApp(QMainWindow):
         self.log_output.append(log_message)
         self.log_output.moveCursor(QTextCursor.End)
 
+    def poll_resource_stats(self):
+        """Poll system and GPU resource statistics while the worker is running."""
+        if not self.worker_thread.isRunning():
+            self.resource_timer.stop()
+            return
+
+        try:
+            self.update_system_stats(ResourceMonitor.get_comprehensive_stats())
+        except Exception as e:
+            self.append_to_log(f"🔴 Resource monitoring error: {e}")
+
     def update_system_stats(self, stats):
         """Update system resource statistics."""
-        # Get CPU info with default values if keys are missing
-        cpu_info = stats.get("CPU", {})
-        cpu_usage = cpu_info.get("usage", "N/A")
-        cpu_cores = cpu_info.get("cores", "N/A")
-        cpu_freq = cpu_info.get("frequency", "N/A")
-
-        # Get memory info with default values if keys are missing
-        memory_info = stats.get("Memory", {})
-        memory_used = memory_info.get("used", "N/A")
-        memory_available = memory_info.get("available", "N/A")
-
-        # Get GPU info, defaulting to an empty list if missing
-        gpu_info = stats.get("GPU", [])
-        
-        if gpu_info:
-            gpu_stats = "\n".join([
-                f"{gpu.get('name', 'N/A')}: "
-                f"{gpu.get('memory_used', 'N/A')}/{gpu.get('memory_total', 'N/A')} MB, "
-                f"Load: {gpu.get('gpu_load', 'N/A')}"
-                for gpu in gpu_info
-            ])
-        else:
-            gpu_stats = "No GPU detected."
-
-        # Update the label with the gathered system stats
         self.system_stats_label.setText(
-            f"CPU Usage: {cpu_usage} | Cores: {cpu_cores} | Freq: {cpu_freq} \n"
-            f"Memory Usage: {memory_used} | Available: {memory_available} \n"
-            f"GPU Stats:\n{gpu_stats}"
-    )
-
-
-    # def update_system_stats(self, stats):
-    #     """Update system resource statistics."""
-    #     cpu_info = stats["CPU"]
-    #     memory_info = stats["Memory"]
-    #     gpu_info = stats["GPU"]
-
-    #     gpu_stats = "\n".join([
-    #         f"{gpu['name']}: {gpu['memory_used']}/{gpu['memory_total']} MB, Load: {gpu['gpu_load']}"
-    #         for gpu in gpu_info
-    #     ]) if gpu_info else "No GPU detected."
-
-    #     self.system_stats_label.setText(
-    #         f"CPU Usage: {cpu_info['usage']} | Cores: {cpu_info['cores']} | Freq: {cpu_info['frequency']}\n"
-    #         f"Memory Usage: {memory_info['used']} | Available: {memory_info['available']}\n"
-    #         f"GPU Stats:\n{gpu_stats}"
-    #     )
+            f"CPU Usage: {stats.cpu_usage} | Cores: {stats.cores} | Freq: {stats.freq} \n"
+            f"Memory Usage: {stats.mem_used} | Available: {stats.mem_avail} \n"
+            f"GPU Stats:\n{stats.gpu_lines}"
+        )
 
 
 if __name__ == "__main__":
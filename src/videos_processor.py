@@ -1,44 +1,150 @@
 import os
 import cv2
+import numpy as np
+import collections
+import glob
+import importlib.util
+import io
+import itertools
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import re
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
 import traceback
-from fpdf import FPDF
-from pptx import Presentation
-from pptx.util import Inches, Pt
+from concurrent.futures import ThreadPoolExecutor
 
 from datetime import datetime
+from pathlib import Path
 
+# PyAV and TurboJPEG are loaded on first use so that importing this module (and opening the GUI) stays fast
+_av = None
+_turbojpeg = None
+_turbojpeg_lock = threading.Lock()
 
 
+def _load_av():
+    """Import PyAV on first use; returns the module, or False when it is not installed."""
+    global _av
+    if _av is None:
+        try:
+            import av
+            import av.codec.hwaccel
+            _av = av
+        except ImportError:  # PyAV is optional; OpenCV handles decoding without it
+            _av = False
+    return _av
+
+
+def _get_turbojpeg():
+    """Create the TurboJPEG encoder on first use; returns None when PyTurboJPEG or libturbojpeg is missing."""
+    global _turbojpeg
+    with _turbojpeg_lock:
+        if _turbojpeg is None:
+            try:
+                from turbojpeg import TurboJPEG
+                _turbojpeg = TurboJPEG()
+            except (ImportError, OSError, RuntimeError):  # cv2.imencode is used instead
+                _turbojpeg = False
+    return _turbojpeg or None
+
+
+
+
+def _batched(iterable, n):
+    """Group an iterable into lists of up to n items without materialising it."""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, n)):
+        yield batch
+
+
+# Python 3.12+ ships the same grouper in C
+_batched = getattr(itertools, "batched", _batched)
+
+
+def _prefetched(pool, fn, iterable, depth):
+    """Yield (item, future of fn(item)) in order, keeping up to depth calls running ahead of the consumer."""
+    pending = collections.deque()
+    for item in iterable:
+        pending.append((item, pool.submit(fn, item)))
+        if len(pending) > depth:
+            yield pending.popleft()
+
+    while pending:
+        yield pending.popleft()
+
+
+# PDF layout in millimetres (A4 portrait, three frames per page); PyMuPDF works in points
+MM = 72 / 25.4
+# Pixel size frames are embedded at: the 190x80 mm slot at 4 px/mm (~100 DPI)
+PDF_IMAGE_SIZE = (760, 320)
+
+
+def _pdf_image(frame_path):
+    """Shrink a frame to the PDF slot size and re-encode it, so the PDF only carries pixels it can show."""
+    from PIL import Image
+
+    # Read the file once: embedded as-is when it already fits, decoded only when it must be resized
+    with open(frame_path, "rb") as f:
+        jpeg = f.read()
+
+    # Pillow only parses the JPEG header here
+    with Image.open(io.BytesIO(jpeg)) as frame_img:
+        width, height = frame_img.size
+    if width <= PDF_IMAGE_SIZE[0] and height <= PDF_IMAGE_SIZE[1]:
+        return jpeg
+
+    frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError("could not read image")
+
+    return _encode_jpeg(cv2.resize(frame, PDF_IMAGE_SIZE, interpolation=cv2.INTER_AREA), quality=80)
+
 
 def create_pdf_from_frames(frames, video_filename, output_folder, logger=None):
     """Enhanced PDF creation with timeline-based frame titles and robust error handling."""
     try:
-        output_pdf = os.path.join(output_folder, f"{os.path.splitext(video_filename)[0]}.pdf")
+        # Imported on first conversion to keep application start-up fast
+        import pymupdf
+
+        output_pdf = str(Path(output_folder) / f"{Path(video_filename).stem}.pdf")
         
-        pdf = FPDF()
-        pdf.set_auto_page_break(auto=True, margin=15)
+        doc = pymupdf.open()
+        page_width, page_height = pymupdf.paper_size("a4")
+        # Caption font is chosen once; PyMuPDF registers it as a resource once per page
+        caption_style = dict(fontname="helv", fontsize=10, align=pymupdf.TEXT_ALIGN_CENTER)
+        # Image and caption slots are the same on every page
+        y_positions = [10, 90, 170]
+        image_rects = [pymupdf.Rect(10 * MM, y * MM, 200 * MM, (y + 80) * MM) for y in y_positions]
+        caption_rects = [pymupdf.Rect(10 * MM, (y + 80) * MM, 200 * MM, (y + 90) * MM) for y in y_positions]
         
-        for i in range(0, len(frames), 3):
-            pdf.add_page()
-            y_positions = [10, 90, 170]
-            
-            for j, frame_data in enumerate(frames[i:i+3]):
-                frame_path, timestamp = frame_data
-                
-                try:
-                    # Add image to PDF
-                    pdf.image(frame_path, x=10, y=y_positions[j], w=190, h=80)
-                    pdf.set_y(y_positions[j] + 80)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            for page_frames in _batched(frames, 3):
+                page = doc.new_page(width=page_width, height=page_height)
 
-                    # Add frame and timestamp as caption
-                    pdf.set_font("Arial", size=10)
-                    pdf.cell(0, 10, f"Frame: {os.path.basename(frame_path)} : {timestamp}", ln=True, align="C")
+                # Resize the page's frames in parallel; cv2 releases the GIL while decoding and encoding
+                images = [pool.submit(_pdf_image, frame_path) for frame_path, _ in page_frames]
+                captions = [f"Frame: {os.path.basename(frame_path)} : {timestamp}" for frame_path, timestamp in page_frames]
 
-                except Exception as img_error:
-                    if logger:
-                        logger.warning(f"Could not add frame {frame_path}: {img_error}")
+                for j, (frame_path, _) in enumerate(page_frames):
+                    try:
+                        # Add image to PDF; the resized JPEG stream is embedded as-is
+                        page.insert_image(image_rects[j], stream=images[j].result(), keep_proportion=False)
+
+                        # Add frame and timestamp as caption
+                        page.insert_textbox(caption_rects[j], captions[j], **caption_style)
+
+                    except Exception as img_error:
+                        if logger:
+                            logger.warning(f"Could not add frame {frame_path}: {img_error}")
         
-        pdf.output(output_pdf)
+        doc.save(output_pdf, deflate=True)
+        doc.close()
         
         if logger:
             logger.info(f"PDF created: {output_pdf}")
@@ -56,41 +162,54 @@ def create_pdf_from_frames(frames, video_filename, output_folder, logger=None):
 def create_pptx_from_frames(frames, video_filename, output_folder, logger=None):
     """Enhanced PPTX creation with timeline logging."""
     try:
-        output_pptx = os.path.join(output_folder, f"{os.path.splitext(video_filename)[0]}.pptx")
+        # Imported on first conversion to keep application start-up fast
+        from pptx import Presentation
+        from pptx.util import Inches, Pt
+        from PIL import Image
+
+        output_pptx = str(Path(output_folder) / f"{Path(video_filename).stem}.pptx")
         prs = Presentation()
 
-        for idx, frame_data in enumerate(frames):
-            frame_path, timestamp = frame_data
-            slide = prs.slides.add_slide(prs.slide_layouts[5])
-            slide_width = prs.slide_width
-            slide_height = prs.slide_height
+        def read_frame(frame_data):
+            """Read the JPEG once; Pillow only parses its header for the size, the pixels are never decoded."""
+            with open(frame_data[0], "rb") as f:
+                jpeg = io.BytesIO(f.read())
+            with Image.open(jpeg) as frame_img:
+                return jpeg, frame_img.size
 
-            frame_img = cv2.imread(frame_path)
-            if frame_img is None:
-                if logger:
-                    logger.warning(f"Could not read frame {frame_path}")
-                continue
+        # File reads run ahead of slide assembly, which stays in order on this thread
+        with ThreadPoolExecutor() as pool:
+            for idx, (frame_data, frame_read) in enumerate(_prefetched(pool, read_frame, frames, PIPELINE_DEPTH)):
+                frame_path, timestamp = frame_data
+                slide = prs.slides.add_slide(prs.slide_layouts[5])
+                slide_width = prs.slide_width
+                slide_height = prs.slide_height
 
-            frame_width, frame_height = frame_img.shape[1], frame_img.shape[0]
+                try:
+                    jpeg, (frame_width, frame_height) = frame_read.result()
+                except OSError:
+                    if logger:
+                        logger.warning(f"Could not read frame {frame_path}")
+                    continue
 
-            # Intelligent image scaling
-            if frame_width / slide_width > frame_height / slide_height:
-                width = slide_width
-                height = int(frame_height * (slide_width / frame_width))
-            else:
-                height = slide_height
-                width = int(frame_width * (slide_height / frame_height))
+                # Intelligent image scaling; cross-multiplied so the comparison stays in exact integer EMUs
+                if frame_width * slide_height > frame_height * slide_width:
+                    width = slide_width
+                    height = frame_height * slide_width // frame_width
+                else:
+                    height = slide_height
+                    width = frame_width * slide_height // frame_height
 
-            left = (slide_width - width) // 2
-            top = (slide_height - height) // 2
+                left = (slide_width - width) // 2
+                top = (slide_height - height) // 2
 
-            slide.shapes.add_picture(frame_path, left, top, width=width, height=height)
+                slide.shapes.add_picture(jpeg, left, top, width=width, height=height)
 
-            # Add slide title with frame and timestamp
-            title = slide.shapes.add_textbox(Inches(0.1), Inches(0.1), Inches(4), Inches(0.5))
-            title_frame = title.text_frame
-            title_frame.text = f"Frame {idx + 1} : {timestamp}"
-            title_frame.paragraphs[0].font.size = Pt(18)
+                # Add slide title with frame and timestamp
+                title = slide.shapes.add_textbox(Inches(0.1), Inches(0.1), Inches(4), Inches(0.5))
+                title_frame = title.text_frame
+                title_frame.text = f"Frame {idx + 1} : {timestamp}"
+                title_frame.paragraphs[0].font.size = Pt(18)
 
         prs.save(output_pptx)
 
@@ -106,7 +225,349 @@ def create_pptx_from_frames(frames, video_filename, output_folder, logger=None):
         return None
 
 
-def extract_frames(video_path, interval, output_dir="frames", logger=None):
+# Frames buffered between pipeline stages; bounds memory and applies back-pressure
+PIPELINE_DEPTH = 8
+
+
+# Size of the thumbnails compared when skipping near-duplicate frames
+THUMBNAIL_SIZE = (160, 90)
+
+
+def _mean_abs_diff(a, b):
+    """Mean absolute per-pixel difference between two uint8 thumbnails (cv2.norm runs it in SIMD C)."""
+    return cv2.norm(a, b, cv2.NORM_L1) / a.size
+
+
+# Seeking only pays off when every frame is a keyframe (intra-only codecs) and
+# the interval skips enough frames to beat sequential grab()
+INTRA_ONLY_FOURCCS = {"MJPG", "mjpa", "mjpb", "jpeg", "AVRn", "apch", "apcn", "apcs", "apco", "ap4h", "AVdn", "AVdh", "FFV1", "HFYU"}
+SEEK_MIN_FRAMES = 60
+
+
+def _fourcc(cap):
+    """Decode the capture's FOURCC code into its four-character string."""
+    code = int(cap.get(cv2.CAP_PROP_FOURCC))
+    return "".join(chr((code >> 8 * i) & 0xFF) for i in range(4))
+
+
+def _open_hwaccel_container(video_path, threads):
+    """Open the video with PyAV on the CUDA (NVDEC) decoder, or return None if unavailable."""
+    av = _load_av()
+    if not av:
+        return None
+
+    try:
+        # Without software fallback, codecs NVDEC cannot handle fail here instead of quietly decoding on the CPU
+        hwaccel = av.codec.hwaccel.HWAccel(device_type="cuda", allow_software_fallback=False)
+        container = av.open(video_path, hwaccel=hwaccel)
+    except av.FFmpegError:
+        # No usable CUDA device: fall back to OpenCV's software decoder
+        return None
+
+    stream = container.streams.video[0]
+    if not stream.codec_context.is_hwaccel:
+        # Hardware decoding was not set up for this stream; OpenCV decodes it (and can seek) instead
+        container.close()
+        return None
+
+    stream.thread_type = "AUTO"
+    stream.thread_count = threads
+    return container
+
+
+def _open_nvdec_capture(video_path, logger=None):
+    """Open the video with ffmpegcv's NVDEC reader, or return None if ffmpegcv or a CUDA GPU is unavailable."""
+    try:
+        # Imported on demand: ffmpegcv probes for the ffmpeg binaries at import time
+        import ffmpegcv
+        return ffmpegcv.VideoCaptureNV(video_path)
+    except Exception as e:
+        # ffmpegcv raises RuntimeError/AssertionError when ffmpeg, the GPU or its decoder is missing
+        if logger:
+            logger.warning(f"ffmpegcv NVDEC reader unavailable for {video_path}: {e!r}")
+        return None
+
+
+def _sample_nvdec_capture(cap, frame_interval):
+    """Make ffmpeg itself keep every frame_interval-th frame, so only kept frames are converted and piped to Python.
+
+    ffmpegcv has no option for output filters; its reader starts the ffmpeg command lazily on the
+    first read, so the output options of that command are replaced before then.
+    """
+    head, _ = cap.ffmpeg_cmd.rsplit(" -pix_fmt ", 1)
+    select = shlex.quote(f"select=not(mod(n\\,{frame_interval}))")
+    # passthrough keeps ffmpeg from duplicating frames back up to the input rate
+    cap.ffmpeg_cmd = f"{head} -vf {select} -vsync passthrough -pix_fmt {cap.pix_fmt} -f rawvideo pipe:"
+
+
+def may_decode_on_gpu(backend=None):
+    """Whether extract_frames with this backend can open a CUDA (NVDEC) decode session."""
+    # find_spec checks for PyAV without importing it
+    return backend == "nvdec" or (backend is None and importlib.util.find_spec("av") is not None)
+
+
+def _downscale(frame, max_width):
+    """Shrink frames wider than max_width (keeping aspect ratio); INTER_AREA avoids aliasing."""
+    if not max_width or frame.shape[1] <= max_width:
+        return frame
+
+    scale = max_width / frame.shape[1]
+    return cv2.resize(frame, (max_width, max(1, round(frame.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+
+
+def _take_buffer(free_buffers):
+    """Reuse a recycled decode buffer if one is free (None lets OpenCV allocate a new one)."""
+    try:
+        return free_buffers.get_nowait()
+    except queue.Empty:
+        return None
+
+
+def _queue_frame(frame_queue, free_buffers, frame_count, seconds, frame, max_width):
+    """Queue a decoded frame along with the buffer the consumer should recycle once it is encoded."""
+    scaled = _downscale(frame, max_width)
+    if scaled is frame:
+        frame_queue.put((frame_count, seconds, frame, frame))
+    else:
+        # The downscaled copy is independent, so the decode buffer is free again right away
+        free_buffers.put(frame)
+        frame_queue.put((frame_count, seconds, scaled, None))
+
+
+def _decode_frames(cap, fps, frame_interval, max_width, free_buffers, frame_queue, stop_event):
+    """OpenCV decode stage: queue (frame_count, seconds, frame) for every frame on the extraction interval."""
+    frame_count = 0
+    try:
+        # Read the stream sequentially until it ends: grab() advances the decoder without the
+        # colour conversion and copy, retrieve() is only paid on kept frames. CAP_PROP_FRAME_COUNT
+        # is only an estimate (VFR, B-frames), so it never bounds the loop.
+        for target in itertools.count(0, frame_interval):
+            while frame_count < target and cap.grab():
+                frame_count += 1
+
+            if stop_event.is_set() or frame_count < target or not cap.grab():
+                break
+
+            # Decode into a recycled buffer when one is free instead of allocating per frame
+            ret, frame = cap.retrieve(_take_buffer(free_buffers))
+            frame_count += 1
+
+            if not ret:
+                break
+
+            _queue_frame(frame_queue, free_buffers, target, target / fps, frame, max_width)
+    finally:
+        cap.release()
+        frame_queue.put(None)
+
+
+def _decode_frames_seek(cap, fps, frame_interval, max_width, free_buffers, frame_queue, stop_event):
+    """OpenCV seek stage: jump straight to each kept frame instead of grabbing the ones in between."""
+    try:
+        # Seek until a read fails rather than trusting the estimated frame count
+        for frame_count in itertools.count(0, frame_interval):
+            if stop_event.is_set():
+                break
+
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count)
+            ret, frame = cap.read(_take_buffer(free_buffers))
+
+            if not ret:
+                break
+
+            _queue_frame(frame_queue, free_buffers, frame_count, frame_count / fps, frame, max_width)
+    finally:
+        cap.release()
+        frame_queue.put(None)
+
+
+def _decode_frames_pyav(container, interval, max_width, frame_queue, stop_event):
+    """PyAV decode stage: sample by presentation time and convert only the kept frames to BGR."""
+    next_time = 0.0
+    try:
+        for frame_count, frame in enumerate(container.decode(video=0)):
+            if stop_event.is_set():
+                break
+
+            if frame.time is None or frame.time < next_time:
+                continue
+
+            while next_time <= frame.time:
+                next_time += interval
+
+            frame_queue.put((frame_count, frame.time, _downscale(frame.to_ndarray(format="bgr24"), max_width), None))
+    finally:
+        container.close()
+        frame_queue.put(None)
+
+
+def _decode_frames_nvdec(cap, fps, frame_interval, max_width, frame_queue, stop_event):
+    """ffmpegcv NVDEC stage: ffmpeg decodes on the GPU and only pipes every frame_interval-th frame."""
+    try:
+        for frame_count, frame in zip(itertools.count(0, frame_interval), cap):
+            if stop_event.is_set():
+                break
+
+            frame_queue.put((frame_count, frame_count / fps, _downscale(frame, max_width), None))
+    finally:
+        cap.release()
+        frame_queue.put(None)
+
+
+def _format_timestamp(seconds):
+    """Format a position in seconds as HH:MM:SS."""
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02}:{minutes:02}:{seconds:02}"
+
+
+def _extract_frames_ffmpeg(ffmpeg, video_path, interval, output_dir, max_width, scene_threshold=None, logger=None):
+    """Let a single ffmpeg process decode, sample, scale and JPEG-encode the frames natively.
+
+    Frames are sampled every interval seconds (fps filter), or, with scene_threshold, whenever
+    the scene-change score exceeds it (select filter; the first frame is always kept).
+    """
+    pattern = os.path.join(output_dir, "frame_%05d.jpg")
+    # Leftovers from an earlier run would otherwise be reported as extracted frames
+    for stale in glob.glob(os.path.join(output_dir, "frame_*.jpg")):
+        os.remove(stale)
+
+    if scene_threshold:
+        # showinfo logs each selected frame's pts_time, which becomes its timestamp
+        filters = f"select='eq(n\\,0)+gt(scene\\,{scene_threshold})',showinfo"
+        input_opts = ["-loglevel", "info"]
+        output_opts = ["-vsync", "vfr"]
+    else:
+        filters = f"fps=1/{interval}"
+        input_opts = ["-loglevel", "error"]
+        output_opts = []
+    if max_width:
+        filters += f",scale='min(iw,{max_width})':-2:flags=area"
+
+    try:
+        result = subprocess.run([ffmpeg, "-nostdin", "-hide_banner", "-nostats", *input_opts, "-y", "-i", video_path,
+                                 "-vf", filters, *output_opts, "-qscale:v", "3", pattern],
+                                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    except subprocess.CalledProcessError as e:
+        if logger:
+            logger.error(f"ffmpeg failed on {video_path} (exit code {e.returncode}):\n{e.stderr.strip()}")
+        raise
+
+    frame_paths = sorted(glob.glob(os.path.join(output_dir, "frame_*.jpg")))
+    if scene_threshold:
+        seconds = [float(match) for match in re.findall(r"pts_time:\s*(-?[\d.]+)", result.stderr)]
+        if len(seconds) != len(frame_paths):
+            raise RuntimeError(f"ffmpeg reported {len(seconds)} timestamps for {len(frame_paths)} frames")
+    else:
+        # ffmpeg numbers outputs from 1; output i was sampled at (i - 1) * interval
+        seconds = [i * interval for i in range(len(frame_paths))]
+
+    for frame_path, frame_seconds in zip(frame_paths, seconds):
+        yield frame_path, _format_timestamp(frame_seconds)
+
+
+def _encode_jpeg(frame, quality=85):
+    """Encode a BGR frame to JPEG bytes; both encoders release the GIL, so this runs in parallel."""
+    turbojpeg = _get_turbojpeg()
+    if turbojpeg is not None:
+        from turbojpeg import TJPF_BGR, TJSAMP_420
+
+        # Straight into libjpeg-turbo's SIMD encoder, no intermediate NumPy buffer
+        return turbojpeg.encode(frame, quality=quality, pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+
+    # Optimised Huffman tables and a lower chroma quality shrink files noticeably at the same perceived quality
+    ret, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1,
+                                             cv2.IMWRITE_JPEG_PROGRESSIVE, 0, cv2.IMWRITE_JPEG_CHROMA_QUALITY, 80])
+    if not ret:
+        raise RuntimeError("Could not encode frame to JPEG")
+    return jpeg.tobytes()
+
+
+def _run_decoder(decode_target, errors, *args):
+    """Run a decode stage, keeping its exception for the consumer; the stage still queues its end sentinel."""
+    try:
+        decode_target(*args)
+    except Exception as e:
+        errors.append(e)
+
+
+def _write_frames(jpeg_queue, written_queue, errors):
+    """Write stage: wait for each encode in frame order, flush the JPEG bytes to disk and report the frame."""
+    while True:
+        item = jpeg_queue.get()
+        if item is None:
+            break
+
+        # Keep draining after a failure so the encoder never blocks on a full queue
+        if errors:
+            continue
+
+        frame_name, timestamp, future = item
+        try:
+            jpeg = future.result()
+            with open(frame_name, "wb") as f:
+                f.write(jpeg)
+            written_queue.put((frame_name, timestamp))
+        except Exception as e:
+            errors.append(e)
+
+
+def _drain(written_queue):
+    """Yield every frame the writer has already flushed, without blocking."""
+    while True:
+        try:
+            yield written_queue.get_nowait()
+        except queue.Empty:
+            return
+
+
+def prefetch_frames(frames, depth=PIPELINE_DEPTH):
+    """Run a frame iterator on a background thread, buffering up to depth frames ahead of the caller.
+
+    Extraction then keeps going while the caller is busy building the PDF or PPTX.
+    """
+    frame_queue = queue.Queue(maxsize=depth)
+    stop_event = threading.Event()
+    errors = []
+
+    def produce():
+        try:
+            for frame in frames:
+                if stop_event.is_set():
+                    break
+                frame_queue.put(frame)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            # Close the source here, on the thread that iterated it, so its own threads shut down
+            close = getattr(frames, "close", None)
+            if close:
+                close()
+            frame_queue.put(None)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    item = None
+    try:
+        while True:
+            item = frame_queue.get()
+            if item is None:
+                break
+            yield item
+    finally:
+        # Unblock and stop the producer if the caller closed the generator early
+        stop_event.set()
+        while item is not None:
+            item = frame_queue.get()
+        producer.join()
+
+    if errors:
+        raise errors[0]
+
+
+def extract_frames(video_path, interval, output_dir="frames", logger=None, threads=None, encode_pool=None,
+                   max_width=1600, duplicate_tolerance=1.0, backend=None, scene_threshold=None):
     """
     Enhanced frame extraction with timeline logging.
 
@@ -115,9 +576,23 @@ def extract_frames(video_path, interval, output_dir="frames", logger=None):
         interval (int): Seconds between frame extractions
         output_dir (str): Directory to save extracted frames
         logger (logging.Logger): Logger for tracking extraction process
-
-    Returns:
-        list: List of tuples (frame_path, timestamp)
+        threads (int): FFmpeg decoder threads (defaults to all CPU cores)
+        encode_pool (concurrent.futures.Executor): Pool for JPEG encoding, shareable across videos
+        max_width (int): Downscale wider frames to this width in pixels (None or 0 keeps the original size)
+        duplicate_tolerance (float): Skip frames whose mean absolute difference (0-255) from the
+            last kept frame is at or below this value, e.g. an unchanged slide (0 keeps every frame)
+        backend (str): "nvdec" decodes on the GPU through ffmpegcv, falling back to the default
+            decoders when CUDA is unavailable; "ffmpeg" hands the whole extraction to one ffmpeg
+            process (no per-frame Python work, but duplicate_tolerance is not applied)
+            (None picks PyAV NVDEC, then OpenCV)
+        scene_threshold (float): With backend="ffmpeg", keep a frame whenever ffmpeg's scene-change
+            score (0-1, e.g. 0.4) exceeds this value, instead of one every interval seconds
+
+    Yields:
+        tuple: (frame_path, timestamp) for each frame, once it has been written to disk
+
+    Raises:
+        Exception: Any decode, encode or write failure, after it has been logged
     """
     try:
 
@@ -138,55 +613,241 @@ def extract_frames(video_path, interval, output_dir="frames", logger=None):
 
         os.makedirs(output_dir, exist_ok=True)
 
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
+        if backend == "ffmpeg":
+            ffmpeg = shutil.which("ffmpeg")
+            if ffmpeg:
+                if logger:
+                    sampling = f"scene changes above {scene_threshold}" if scene_threshold else "fps filter"
+                    logger.info(f"Decoder: ffmpeg subprocess ({sampling})")
+                extracted_count = 0
+                for extracted_count, written in enumerate(
+                        _extract_frames_ffmpeg(ffmpeg, video_path, interval, output_dir, max_width, scene_threshold,
+                                              logger), 1):
+                    yield written
+                if logger:
+                    logger.info(f"Extracted {extracted_count} frames from {video_path}")
+                return
+            if logger:
+                logger.warning("ffmpeg not found on PATH, using the default decoders")
+
+        threads = threads or multiprocessing.cpu_count()
+        nvdec_cap = _open_nvdec_capture(video_path, logger) if backend == "nvdec" else None
+        if backend == "nvdec" and nvdec_cap is None and logger:
+            logger.warning("NVDEC backend unavailable (needs ffmpegcv, ffmpeg and a CUDA GPU), using the default decoders")
+        container = _open_hwaccel_container(video_path, threads) if nvdec_cap is None else None
+
+        # Full-size decode buffers handed back by the consumer once their frame is encoded
+        free_buffers = queue.Queue()
+
+        if nvdec_cap is not None:
+            fps = nvdec_cap.fps
+            total_frames = nvdec_cap.count
+            frame_interval = max(1, int(round(fps * interval)))
+            _sample_nvdec_capture(nvdec_cap, frame_interval)
+            decode_target, decode_args = _decode_frames_nvdec, (nvdec_cap, fps, frame_interval, max_width)
             if logger:
-                logger.error(f"Failed to open video: {video_path}")
-            return []
+                logger.info(f"Processing video: {video_path}")
+                logger.info(f"Total Frames: {total_frames}, FPS: {fps}, Extraction Interval: {frame_interval}")
+                logger.info("Decoder: ffmpegcv NVDEC (CUDA)")
+        elif container is not None:
+            stream = container.streams.video[0]
+            fps = float(stream.average_rate or 0)
+            total_frames = stream.frames
+            decode_target, decode_args = _decode_frames_pyav, (container, interval, max_width)
+            if logger:
+                logger.info(f"Processing video: {video_path}")
+                logger.info(f"Total Frames: {total_frames}, FPS: {fps}, Extraction Interval: {interval} seconds")
+                logger.info(f"Decoder: PyAV NVDEC (CUDA), threads: {threads}")
+        else:
+            # The FFmpeg backend only honours the thread count as an open parameter
+            cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_N_THREADS, threads])
+            if not cap.isOpened():
+                if logger:
+                    logger.error(f"Failed to open video: {video_path}")
+                return
 
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        frame_interval = max(1, int(fps * interval))
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            frame_interval = max(1, int(round(fps * interval)))
+            fourcc = _fourcc(cap)
 
-        extracted_frames = []
-        frame_count = 0
+            if frame_interval > SEEK_MIN_FRAMES and fourcc in INTRA_ONLY_FOURCCS:
+                strategy = "seek"
+                decode_target, decode_args = _decode_frames_seek, (cap, fps, frame_interval, max_width, free_buffers)
+            else:
+                strategy = "sequential grab/retrieve"
+                decode_target, decode_args = _decode_frames, (cap, fps, frame_interval, max_width, free_buffers)
+
+            if logger:
+                logger.info(f"Processing video: {video_path}")
+                logger.info(f"Total Frames: {total_frames}, FPS: {fps}, Extraction Interval: {frame_interval}")
+                logger.info(f"Decoder: OpenCV ({fourcc}, {strategy}), threads: {threads}")
+
+        if logger and max_width:
+            logger.info(f"Frames wider than {max_width}px are downscaled: smaller files and faster encoding, less detail")
+
+        extracted_count = 0
+        previous_thumbnail = None
+        skipped_duplicates = 0
+
+        # Three-stage pipeline: decode thread -> JPEG encode pool -> writer thread
+        own_pool = encode_pool is None
+        if own_pool:
+            # cv2.imencode and TurboJPEG release the GIL, so every core can encode at once
+            encode_pool = ThreadPoolExecutor(max_workers=multiprocessing.cpu_count())
+
+        frame_queue = queue.Queue(maxsize=PIPELINE_DEPTH)
+        # Deep enough to keep every encode worker busy while the writer waits on the oldest frame
+        jpeg_queue = queue.Queue(maxsize=max(PIPELINE_DEPTH, 2 * multiprocessing.cpu_count()))
+        # Unbounded so the writer never waits on the caller; it is drained between frames
+        written_queue = queue.Queue()
+        stop_event = threading.Event()
+        decode_errors = []
+        write_errors = []
+
+        decoder = threading.Thread(target=_run_decoder,
+                                   args=(decode_target, decode_errors, *decode_args, frame_queue, stop_event), daemon=True)
+        writer = threading.Thread(target=_write_frames, args=(jpeg_queue, written_queue, write_errors), daemon=True)
+        decoder.start()
+        writer.start()
+
+        item = None
+        try:
+            while True:
+                item = frame_queue.get()
+                if item is None:
+                    break
+
+                frame_count, current_time_sec, frame, buffer = item
+
+                # Compare small thumbnails so static slides do not repeat in the output
+                if duplicate_tolerance:
+                    thumbnail = cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+                    if previous_thumbnail is not None and _mean_abs_diff(thumbnail, previous_thumbnail) <= duplicate_tolerance:
+                        skipped_duplicates += 1
+                        if buffer is not None:
+                            free_buffers.put(buffer)
+                        continue
+                    previous_thumbnail = thumbnail
+
+                # Calculate timestamp
+                timestamp = _format_timestamp(current_time_sec)
+
+                # Encode frame in the pool; the writer waits on the futures in order
+                frame_name = os.path.join(output_dir, f"frame_{frame_count:05d}.jpg")
+                future = encode_pool.submit(_encode_jpeg, frame)
+                if buffer is not None:
+                    future.add_done_callback(lambda _, buffer=buffer: free_buffers.put(buffer))
+                jpeg_queue.put((frame_name, timestamp, future))
+
+                # Hand finished frames to the caller while later ones are still in flight
+                for written in _drain(written_queue):
+                    extracted_count += 1
+                    yield written
+
+            jpeg_queue.put(None)
+            writer.join()
+            for written in _drain(written_queue):
+                extracted_count += 1
+                yield written
+        finally:
+            # Unblock and stop the decoder if encoding bailed out early
+            stop_event.set()
+            while item is not None:
+                item = frame_queue.get()
+            decoder.join()
+
+            # Stop the writer too if the caller closed the generator early
+            if writer.is_alive():
+                jpeg_queue.put(None)
+                writer.join()
+            if own_pool:
+                encode_pool.shutdown()
+
+        # A failed decode also ends the frame stream, so it must not pass for the end of the video
+        if decode_errors:
+            raise decode_errors[0]
+        if write_errors:
+            raise write_errors[0]
 
         if logger:
-            logger.info(f"Processing video: {video_path}")
-            logger.info(f"Total Frames: {total_frames}, FPS: {fps}, Extraction Interval: {frame_interval}")
+            if skipped_duplicates:
+                logger.info(f"Skipped {skipped_duplicates} near-duplicate frames")
+            logger.info(f"Extracted {extracted_count} frames from {video_path}")
 
-        while frame_count < total_frames:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_count)
-            ret, frame = cap.read()
+    except Exception as e:
+        if logger:
+            logger.error(f"Frame extraction error for {video_path}: {e}")
+            logger.error(traceback.format_exc())
+        # Frames may already have been consumed; the caller must not treat a cut-short stream as complete
+        raise
 
-            if not ret:
-                break
 
-            # Calculate timestamp
-            current_time_sec = frame_count / fps
-            timestamp = f"{int(current_time_sec // 3600):02}:{int((current_time_sec % 3600) // 60):02}:{int(current_time_sec % 60):02}"
 
-            # Save frame
-            frame_name = os.path.join(output_dir, f"frame_{frame_count:05d}.jpg")
-            cv2.imwrite(frame_name, frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            extracted_frames.append((frame_name, timestamp))
 
-            # if logger:
-            #     logger.info(f"Extracted Frame {frame_count // frame_interval + 1} at {timestamp}")
+# Logger for process_video in worker processes, set up by init_worker
+_worker_logger = None
 
-            frame_count += frame_interval
 
-        cap.release()
+def init_worker(log_queue, worker_cores=None):
+    """Process pool initializer: forward this process's log records to log_queue and pin it to worker_cores."""
+    global _worker_logger
+    if worker_cores:
+        # Set before any thread starts, so the decode, encode and write threads inherit the CPU set
+        os.sched_setaffinity(0, worker_cores)
 
-        if logger:
-            logger.info(f"Extracted {len(extracted_frames)} frames from {video_path}")
+    _worker_logger = logging.getLogger(f"VideoWorker-{os.getpid()}")
+    _worker_logger.setLevel(logging.INFO)
+    _worker_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _worker_logger.propagate = False
 
-        return extracted_frames
 
-    except Exception as e:
-        if logger:
-            logger.error(f"Frame extraction error for {video_path}: {e}")
-            logger.error(traceback.format_exc())
-        return []
+def process_video(video_path, output_folder, output_format, frame_interval, max_width=1600, threads=None,
+                  backend=None, logger=None):
+    """
+    Extract frames from one video and build its PDF or PPTX.
 
+    Top-level so that a process pool can run each video in its own process, with its own GIL.
 
+    Returns:
+        str: Path of the created document, or a falsy value on failure
+    """
+    logger = logger or _worker_logger or logging.getLogger(__name__)
+    try:
+        logger.info(f"Processing: {video_path}")
+        base_name = os.path.splitext(os.path.basename(video_path))[0]  # Extract base name
+
+        # Videos run concurrently and may share a base name, so each job extracts into its own scratch directory
+        frames_dir = tempfile.mkdtemp(prefix=f"{base_name}_")
+        try:
+            with ThreadPoolExecutor(max_workers=threads or multiprocessing.cpu_count()) as encode_pool:
+                extracted = extract_frames(video_path, interval=frame_interval, output_dir=frames_dir,
+                                           logger=logger, threads=threads, encode_pool=encode_pool,
+                                           max_width=max_width, backend=backend)
+                # Keep extracting on a separate thread while the document builder works on earlier frames
+                extracted = prefetch_frames(extracted)
+                try:
+                    # Frames are streamed into the document builder; probe the first one to detect empty output
+                    first_frame = next(extracted, None)
+                    if first_frame is None:
+                        logger.error(f"No frames extracted from {video_path}")
+                        return False
+                    frames = itertools.chain([first_frame], extracted)
+
+                    logger.info(f"Base Name : {base_name} ---- {video_path}")
+
+                    if output_format == "pdf":
+                        return create_pdf_from_frames(frames, base_name, output_folder, logger=logger)
+                    elif output_format == "pptx":
+                        return create_pptx_from_frames(frames, base_name, output_folder, logger=logger)
+                    else:
+                        logger.error(f"Unsupported format: {output_format}")
+                        return False
+                finally:
+                    # Stop extraction before its frames directory is removed
+                    extracted.close()
+        finally:
+            shutil.rmtree(frames_dir, ignore_errors=True)
+    except Exception:
+        logger.error(f"Comprehensive error processing {video_path}: {traceback.format_exc()}")
+        return False